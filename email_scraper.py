@@ -1,12 +1,18 @@
 import imaplib
-import email
 from email import policy, utils
+from email.parser import BytesHeaderParser, BytesParser
 from bs4 import BeautifulSoup
-import json
+import orjson
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
 import re
+import base64
+import binascii
+import quopri
+from itertools import takewhile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -15,11 +21,43 @@ IMAP_SERVER = 'imapmail.libero.it'
 EMAIL_ACCOUNT = os.getenv('EMAIL_ACCOUNT')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
 LISTINGS_FILE = 'listings.json'
+SEEN_UIDS_FILE = 'seen_uids.json'
 BAD_KEYWORDS = ['stazione', 'asta', 'affitto', 'Corsica', 'corsica', 'mansarda', 'villaggio']
 MAX_SQUARE_METERS = 105
 MIN_SQUARE_METERS = 60
 MAX_LISTING_AGE = timedelta(days=30)
 MIN_PRICE_PER_SQM = 1700
+# Per-listing skip/accept messages are only printed when SCRAPER_DEBUG=1
+DEBUG = os.getenv('SCRAPER_DEBUG') == '1'
+PRICE_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.5
+SEARCH_CRITERIA = '(OR FROM "noreply@notifiche.immobiliare.it" FROM "noreply_at_casa.it_4j78rss9@duck.com")'
+FETCH_BATCH_SIZE = 100
+# Below this many emails, starting worker processes costs more than parsing inline
+PARALLEL_PARSE_MIN_EMAILS = 8
+PARSE_WORKERS = os.cpu_count() or 1
+# PEEK leaves \Seen untouched until we flag the batch ourselves
+FETCH_ITEMS_HTML_PART = '(BODY.PEEK[HEADER.FIELDS (DATE FROM SUBJECT)] BODY.PEEK[{section}])'
+# Fallback for messages whose BODYSTRUCTURE has no usable text/html part
+FETCH_ITEMS = '(BODY.PEEK[HEADER.FIELDS (DATE FROM SUBJECT MIME-VERSION CONTENT-TYPE CONTENT-TRANSFER-ENCODING)] BODY.PEEK[TEXT])'
+FETCH_RESPONSE_RE = re.compile(rb'^(\d+) \(')
+FETCH_UID_RE = re.compile(rb'\bUID (\d+)')
+STRUCTURE_TOKEN_RE = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}|([^\s()"]+))')
+HEADER_PARSER = BytesHeaderParser(policy=policy.default)
+MESSAGE_PARSER = BytesParser(policy=policy.default)
+
+IMMO_LINK = 'https://clicks.immobiliare.it/'
+CASA_LINK = 'https://www.casa.it/immobili/'
+IMMO_STYLE_RE = re.compile(r'color:\s*#0074c1')
+CASA_STYLE_RE = re.compile(r'color:\s*#1A1F24')
+CASA_SIZE_STYLE_RE = re.compile(r'padding-right:\s*10px')
+CASA_PRICE_STYLE_RE = re.compile(r'font-weight:\s*bold')
+SQM_RE = re.compile(r'(\d+)\s*m²')
+IMMO_PRICE_RE = re.compile(r'€\s*(\d[\d.,]*)')
+AMOUNT_RE = re.compile(r'\d[\d.,]*')
+NUMBER_RE = re.compile(r'(\d+)')
+# Names are lowercased before matching, so the keywords are too
+BAD_KEYWORDS_RE = re.compile('|'.join(re.escape(k) for k in dict.fromkeys(k.lower() for k in BAD_KEYWORDS)))
 
 
 def connect_mail():
@@ -33,13 +71,229 @@ def connect_mail():
         raise
 
 
+def optimize_sequence(email_ids):
+    """Collapse message ids into a compact IMAP sequence set, e.g. '1:5,7,10:20'."""
+    ranges = []
+    for eid in sorted({int(eid) for eid in email_ids}):
+        if ranges and eid == ranges[-1][1] + 1:
+            ranges[-1][1] = eid
+        else:
+            ranges.append([eid, eid])
+    return ','.join(f"{start}:{end}" if start != end else str(start) for start, end in ranges)
+
+
+def parse_fetch_response(msg_data):
+    """Split a batched header + text FETCH into (uid, sequence number, header, text) tuples.
+
+    The uid is None if the server sent none; it may follow the literals, in the closing bytes item.
+    """
+    messages = []
+    for item in msg_data:
+        prefix, payload = item if isinstance(item, tuple) else (item, None)
+        if not isinstance(prefix, bytes):
+            continue
+        match = FETCH_RESPONSE_RE.match(prefix)
+        if match:
+            messages.append([None, int(match.group(1)), b'', b''])
+        if not messages:
+            continue
+        uid_match = FETCH_UID_RE.search(prefix)
+        if uid_match and messages[-1][0] is None:
+            messages[-1][0] = int(uid_match.group(1))
+        if payload is None:
+            continue
+        if b'HEADER' in prefix:
+            messages[-1][2] = payload
+        else:
+            messages[-1][3] = payload
+    return [tuple(message) for message in messages]
+
+
+def parse_bodystructure(data):
+    """Parse an IMAP BODYSTRUCTURE s-expression into nested lists, with NIL as None."""
+    stack = [[]]
+    pos = 0
+    while True:
+        match = STRUCTURE_TOKEN_RE.match(data, pos)
+        if not match:
+            return None
+        pos = match.end()
+        open_paren, close_paren, quoted, literal_size, atom = match.groups()
+        if open_paren:
+            stack.append([])
+        elif close_paren:
+            if len(stack) == 1:
+                return None
+            node = stack.pop()
+            if len(stack) == 1:
+                return node
+            stack[-1].append(node)
+        elif quoted is not None:
+            stack[-1].append(re.sub(rb'\\(.)', rb'\1', quoted).decode('utf-8', 'replace'))
+        elif literal_size:
+            size = int(literal_size)
+            stack[-1].append(data[pos:pos + size].decode('utf-8', 'replace'))
+            pos += size
+        else:
+            stack[-1].append(None if atom.upper() == b'NIL' else atom.decode('ascii', 'replace'))
+
+
+def parse_structure_response(msg_data):
+    """Turn a batched (BODYSTRUCTURE) FETCH into (uid, structure) pairs."""
+    chunks = []
+    for item in msg_data:
+        data = b''.join(item) if isinstance(item, tuple) else item
+        if not data:
+            continue
+        if FETCH_RESPONSE_RE.match(data) or not chunks:
+            chunks.append(data)
+        else:
+            chunks[-1] += data
+    results = []
+    for chunk in chunks:
+        uid_match = FETCH_UID_RE.search(chunk)
+        start = chunk.find(b'BODYSTRUCTURE ')
+        if uid_match and start != -1:
+            results.append((int(uid_match.group(1)), parse_bodystructure(chunk[start + len(b'BODYSTRUCTURE '):])))
+    return results
+
+
+def find_html_section(structure, section=''):
+    """Return (section, encoding, charset) of the first inline text/html part, or None."""
+    if not structure:
+        return None
+    if isinstance(structure[0], list):
+        children = takewhile(lambda part: isinstance(part, list), structure)
+        for number, child in enumerate(children, 1):
+            found = find_html_section(child, f"{section}.{number}" if section else str(number))
+            if found:
+                return found
+        return None
+
+    if len(structure) < 7 or (str(structure[0]).lower(), str(structure[1]).lower()) != ('text', 'html'):
+        return None
+    disposition = structure[9] if len(structure) > 9 else None
+    if isinstance(disposition, list) and disposition and str(disposition[0]).lower() == 'attachment':
+        return None
+    params = structure[2] if isinstance(structure[2], list) else []
+    charset = dict(zip((str(k).lower() for k in params[::2]), params[1::2])).get('charset') or 'utf-8'
+    return section or '1', str(structure[5] or '7bit').lower(), charset
+
+
+def decode_part(payload, encoding, charset):
+    if encoding == 'base64':
+        try:
+            payload = base64.b64decode(payload)
+        except binascii.Error:
+            # Malformed base64: let the email package decode it leniently, as it did for whole messages
+            part = MESSAGE_PARSER.parsebytes(b'Content-Transfer-Encoding: base64\r\n\r\n' + payload)
+            payload = part.get_payload(decode=True)
+    elif encoding == 'quoted-printable':
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(charset, errors='replace')
+    except LookupError:
+        return payload.decode('utf-8', errors='replace')
+
+
+def html_from_message(header, text):
+    msg = MESSAGE_PARSER.parsebytes(header + text)
+    if msg.is_multipart():
+        return find_html_body(msg)
+    return msg.get_content()
+
+
+def fetch_messages(mail, uids):
+    """UID FETCH the given messages in batches; returns (seq, header, html) triples and the UIDs fetched.
+
+    A BODYSTRUCTURE pass first locates each message's text/html part, so only that section is
+    downloaded instead of the plain-text alternative and attachments.
+    """
+    messages = []
+    fetched_uids = []
+    for i in range(0, len(uids), FETCH_BATCH_SIZE):
+        batch = uids[i:i + FETCH_BATCH_SIZE]
+        structure_data = fetch_items(mail, batch, '(BODYSTRUCTURE)')
+
+        by_section = {}
+        for uid, structure in parse_structure_response(structure_data):
+            by_section.setdefault(find_html_section(structure), []).append(uid)
+
+        for html_section, section_uids in by_section.items():
+            items = FETCH_ITEMS_HTML_PART.format(section=html_section[0]) if html_section else FETCH_ITEMS
+            requested = set(section_uids)
+            for uid, seq, header, text in parse_fetch_response(fetch_items(mail, section_uids, items)):
+                # Only UIDs the server actually returned count as fetched; the rest are retried next run
+                if uid not in requested:
+                    continue
+                requested.discard(uid)
+                if html_section:
+                    body = decode_part(text, html_section[1], html_section[2])
+                else:
+                    body = html_from_message(header, text)
+                messages.append((seq, header, body))
+                fetched_uids.append(uid)
+    return messages, fetched_uids
+
+
+def fetch_items(mail, uids, items):
+    """UID FETCH items for uids in one command; if the server rejects the batch, retry one UID at a time."""
+    sequence = optimize_sequence(uids)
+    try:
+        status, msg_data = mail.uid('FETCH', sequence, items)
+    except imaplib.IMAP4.error as e:
+        status, msg_data = 'BAD', [str(e)]
+    if status == 'OK':
+        return msg_data
+    if len(uids) == 1:
+        print(f"❌ Fetch failed for UID {sequence}: {msg_data}")
+        return []
+
+    # Some servers cap the size of a single response; fall back to per-message fetches
+    print(f"⚠️ Batch fetch failed for UIDs {sequence}, retrying one by one")
+    all_data = []
+    for uid in uids:
+        all_data.extend(fetch_items(mail, [uid], items))
+    return all_data
+
+
+def load_seen_uids(uidvalidity):
+    """UIDs already scraped in earlier runs; discarded if the mailbox UIDVALIDITY changed."""
+    if not os.path.exists(SEEN_UIDS_FILE):
+        return set()
+    try:
+        with open(SEEN_UIDS_FILE, 'rb') as f:
+            data = orjson.loads(f.read())
+    except Exception as e:
+        print(f"⚠️ Could not read {SEEN_UIDS_FILE}, rescanning all emails: {e}")
+        return set()
+    if data.get('uidvalidity') != uidvalidity:
+        return set()
+    return set(data.get('uids', []))
+
+
+def save_seen_uids(uidvalidity, uids):
+    try:
+        write_atomic(SEEN_UIDS_FILE, orjson.dumps({'uidvalidity': uidvalidity, 'uids': sorted(uids)}))
+    except Exception as e:
+        print(f"❌ Error saving seen UIDs: {e}")
+
+
+def write_atomic(path, data):
+    """Write to a temporary file and rename it over path, so a crash never leaves it truncated."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
 def load_listings():
     if not os.path.exists(LISTINGS_FILE) or os.path.getsize(LISTINGS_FILE) == 0:
         return []
     try:
-        with open(LISTINGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        with open(LISTINGS_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    except orjson.JSONDecodeError:
         print("⚠️ listings.json is invalid or corrupted. Starting fresh.")
         return []
     except Exception as e:
@@ -48,106 +302,149 @@ def load_listings():
 
 
 def save_listings(listings):
+    """Write listings.json; returns False if it could not be written."""
     try:
-        with open(LISTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(listings, f, indent=2, ensure_ascii=False)
+        write_atomic(LISTINGS_FILE, orjson.dumps(listings, option=orjson.OPT_INDENT_2))
+        return True
     except Exception as e:
         print(f"❌ Error saving listings: {e}")
+        return False
 
 
-def extract_listings_from_email(body, received_time):
-    soup = BeautifulSoup(body, 'html.parser')
-    results = []
+def make_soup(body):
+    try:
+        return BeautifulSoup(body, 'lxml')
+    except Exception as e:
+        print(f"⚠️ lxml could not parse email, falling back to html.parser: {e}")
+        return BeautifulSoup(body, 'html.parser')
+
+
+def parse_euro_amount(amount):
+    """Convert an Italian-formatted amount such as '145.000,50' to a float."""
+    return float(amount.replace('.', '').replace(',', '.'))
+
+
+def new_listing(tag, received_time, extracted_time):
+    return {
+        'name': tag.text.strip(),
+        'link': tag['href'],
+        'square_meters': None,
+        'price': None,
+        'location': 'Unknown',
+        'extracted_time': extracted_time,
+        'received_time': received_time
+    }
+
+
+def parse_immobiliare(tag, received_time, extracted_time):
+    listing = new_listing(tag, received_time, extracted_time)
 
-    # IMMOBILIARE.IT listings
-    immo_tags = soup.find_all('a', href=re.compile(r'https://clicks\.immobiliare\.it/'), style=re.compile(r'color:\s*#0074c1'))
-    for tag in immo_tags:
-        listing = {
-            'name': tag.text.strip(),
-            'link': tag['href'],
-            'square_meters': None,
-            'price': None,
-            'location': 'Unknown',
-            'extracted_time': datetime.now(timezone.utc).isoformat(),
-            'received_time': received_time
-        }
-
-        parent = tag.find_parent('td')
-        if parent:
-            features = parent.find_next('td', class_='realEstateBlock__features')
-            if features:
-                sqm_match = re.search(r'(\d+)\s*m²', features.text)
-                if sqm_match:
-                    listing['square_meters'] = int(sqm_match.group(1))
-
-            price_tag = parent.find_next('td', class_='realEstateBlock__price')
-            if price_tag:
-                price_text = price_tag.text.replace('.', '').replace(',', '.')
-                price_match = re.search(r'€\s*([\d\.]+)', price_text)
-                if price_match:
-                    listing['price'] = float(price_match.group(1))
-
-        results.append(listing)
-
-    # CASA.IT listings
-    casa_tags = soup.find_all('a', href=re.compile(r'https://www\.casa\.it/immobili/'), style=re.compile(r'color:\s*#1A1F24'))
-    for tag in casa_tags:
-        listing = {
-            'name': tag.text.strip(),
-            'link': tag['href'],
-            'square_meters': None,
-            'price': None,
-            'location': 'Unknown',
-            'extracted_time': datetime.now(timezone.utc).isoformat(),
-            'received_time': received_time
-        }
-
-        parent = tag.find_parent()
-        size_tag = parent.find_next('span', style=re.compile(r'padding-right:\s*10px'))
-        if size_tag:
-            sqm_match = re.search(r'(\d+)', size_tag.text)
+    parent = tag.find_parent('td')
+    if parent:
+        features = parent.find_next('td', class_='realEstateBlock__features')
+        if features:
+            sqm_match = SQM_RE.search(features.text)
             if sqm_match:
                 listing['square_meters'] = int(sqm_match.group(1))
 
-        price_tag = parent.find_next('span', style=re.compile(r'font-weight:\s*bold'))
+        price_tag = parent.find_next('td', class_='realEstateBlock__price')
         if price_tag:
-            price_text = price_tag.text.replace('.', '').replace(',', '.')
-            price_match = re.search(r'(\d+)', price_text)
+            price_match = IMMO_PRICE_RE.search(price_tag.text)
             if price_match:
-                listing['price'] = float(price_match.group(1))
+                listing['price'] = parse_euro_amount(price_match.group(1))
+
+    return listing
+
+
+def parse_casa(tag, received_time, extracted_time):
+    listing = new_listing(tag, received_time, extracted_time)
+
+    parent = tag.find_parent()
+    size_tag = parent.find_next('span', style=CASA_SIZE_STYLE_RE)
+    if size_tag:
+        sqm_match = NUMBER_RE.search(size_tag.text)
+        if sqm_match:
+            listing['square_meters'] = int(sqm_match.group(1))
+
+    price_tag = parent.find_next('span', style=CASA_PRICE_STYLE_RE)
+    if price_tag:
+        price_match = AMOUNT_RE.search(price_tag.text)
+        if price_match:
+            # casa.it prices are whole euros; drop anything after the decimal comma
+            listing['price'] = float(price_match.group().replace('.', '').partition(',')[0])
+
+    return listing
+
+
+# (sender marker, link prefix, anchor style, parser); the sender picks the parser
+LISTING_SOURCES = [
+    ('immobiliare.it', IMMO_LINK, IMMO_STYLE_RE, parse_immobiliare),
+    ('casa.it', CASA_LINK, CASA_STYLE_RE, parse_casa),
+]
+
 
-        results.append(listing)
+def extract_listings_from_email(body, received_time, extracted_time, sender=''):
+    sender_address = utils.parseaddr(str(sender))[1].lower()
+    sources = [source for source in LISTING_SOURCES if source[0] in sender_address] or LISTING_SOURCES
+
+    soup = make_soup(body)
+    results = []
+
+    # One walk over the anchors; plain substring checks on href pick the source
+    for tag in soup.find_all('a', href=True, style=True):
+        href = tag['href']
+        for _, link, style_re, parser in sources:
+            if link in href:
+                if style_re.search(tag['style']):
+                    results.append(parser(tag, received_time, extracted_time))
+                break
 
     return results
 
 
-def validate_listing(listing):
+def extract_all_listings(jobs):
+    """Run extract_listings_from_email over (body, received_time, extracted_time, sender) jobs, in order."""
+    if len(jobs) < PARALLEL_PARSE_MIN_EMAILS or PARSE_WORKERS < 2:
+        return [extract_listings_from_email(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+        return list(executor.map(extract_listings_from_email, *zip(*jobs), chunksize=4))
+
+
+def validate_listing(listing, now):
     name = listing['name'].lower()
 
-    if any(bad in name for bad in BAD_KEYWORDS):
-        print(f"⚠️ Skipped (bad keyword): {listing['name']}")
+    bad_match = BAD_KEYWORDS_RE.search(name)
+    if bad_match:
+        if DEBUG:
+            print(f"⚠️ Skipped (bad keyword '{bad_match.group()}'): {listing['name']}")
         return False
     if not listing['square_meters']:
-        print(f"⚠️ Skipped (missing square meters): {listing['name']}")
+        if DEBUG:
+            print(f"⚠️ Skipped (missing square meters): {listing['name']}")
         return False
     if not listing['price']:
-        print(f"⚠️ Skipped (missing price): {listing['name']}")
+        if DEBUG:
+            print(f"⚠️ Skipped (missing price): {listing['name']}")
         return False
     if listing['square_meters'] > MAX_SQUARE_METERS:
-        print(f"⚠️ Skipped (too big): {listing['name']} - {listing['square_meters']} sqm")
+        if DEBUG:
+            print(f"⚠️ Skipped (too big): {listing['name']} - {listing['square_meters']} sqm")
         return False
     if listing['square_meters'] < MIN_SQUARE_METERS:
-        print(f"⚠️ Skipped (too small): {listing['name']} - {listing['square_meters']} sqm")
+        if DEBUG:
+            print(f"⚠️ Skipped (too small): {listing['name']} - {listing['square_meters']} sqm")
         return False
 
     price_per_sqm = listing['price'] / listing['square_meters']
     if price_per_sqm < MIN_PRICE_PER_SQM:
-        print(f"⚠️ Skipped (too cheap per sqm): {listing['name']} - {price_per_sqm:.2f} €/m²")
+        if DEBUG:
+            print(f"⚠️ Skipped (too cheap per sqm): {listing['name']} - {price_per_sqm:.2f} €/m²")
         return False
 
     received_dt = datetime.fromisoformat(listing['received_time'])
-    if datetime.now(timezone.utc) - received_dt > MAX_LISTING_AGE:
-        print(f"⚠️ Skipped (too old): {listing['name']}")
+    if now - received_dt > MAX_LISTING_AGE:
+        if DEBUG:
+            print(f"⚠️ Skipped (too old): {listing['name']}")
         return False
 
     if ',' in listing['name']:
@@ -155,71 +452,111 @@ def validate_listing(listing):
     elif 'in' in listing['name']:
         listing['location'] = listing['name'].split('in')[-1].strip()
 
-    print(f"✅ Valid listing: {listing['name']}")
+    if DEBUG:
+        print(f"✅ Valid listing: {listing['name']}")
     return True
 
 
 def compute_score(listings):
-    prices = [l['price'] / l['square_meters'] for l in listings]
-    times = [datetime.fromisoformat(l['received_time']).timestamp() for l in listings]
-
-    min_price, max_price = min(prices), max(prices)
-    min_time, max_time = min(times), max(times)
+    # Listings missing a field the score needs keep a zero score and go to the end
+    scorable = []
+    unscorable = []
+    for listing in listings:
+        if listing.get('price') and listing.get('square_meters') and listing.get('received_time'):
+            scorable.append(listing)
+        else:
+            listing['score'] = 0.0
+            unscorable.append(listing)
+    if not scorable:
+        return unscorable
+
+    count = len(scorable)
+    prices = np.fromiter((l['price'] / l['square_meters'] for l in scorable), dtype=np.float64, count=count)
+    times = np.fromiter((datetime.fromisoformat(l['received_time']).timestamp() for l in scorable), dtype=np.float64, count=count)
+
+    price_range = np.ptp(prices)
+    time_range = np.ptp(times)
+    norm_price = (prices - prices.min()) / price_range if price_range else np.zeros(count)
+    norm_time = (times - times.min()) / time_range if time_range else np.ones(count)
+
+    scores = PRICE_WEIGHT * (1 - norm_price) + RECENCY_WEIGHT * norm_time
+    for listing, score in zip(scorable, scores.tolist()):
+        listing['score'] = score
 
-    for i, listing in enumerate(listings):
-        price_per_sqm = prices[i]
-        timestamp = times[i]
+    return [scorable[i] for i in np.argsort(-scores, kind='stable')] + unscorable
 
-        norm_price = (price_per_sqm - min_price) / (max_price - min_price) if max_price != min_price else 0
-        norm_time = (timestamp - min_time) / (max_time - min_time) if max_time != min_time else 1
 
-        score = 0.5 * (1 - norm_price) + 0.5 * norm_time
-        listing['score'] = score
-
-    return sorted(listings, key=lambda x: -x['score'])
+def find_html_body(part):
+    """Return the first text/html payload, descending only into multipart containers."""
+    for child in part.iter_parts():
+        if child.get_content_disposition() == 'attachment':
+            continue
+        if child.get_content_type() == 'text/html':
+            return child.get_content()
+        if child.get_content_maintype() == 'multipart':
+            body = find_html_body(child)
+            if body:
+                return body
+    return ""
 
 
 def scrape_listings():
     mail = connect_mail()
     mail.select('inbox')
 
-    status, data = mail.search(None, '(OR FROM "noreply@notifiche.immobiliare.it" FROM "noreply_at_casa.it_4j78rss9@duck.com")')
-    email_ids = data[0].split()
-    print(f"📥 Found {len(email_ids)} emails to process")
+    uidvalidity = int(mail.response('UIDVALIDITY')[1][0] or 0)
 
+    # One clock reading per run: every listing shares the extraction timestamp and age cutoff
+    now = datetime.now(timezone.utc)
+    extracted_time = now.isoformat()
     listings = load_listings()
     seen_names = {l['name'] for l in listings}
-
-    for eid in email_ids[::-1]:
-        status, msg_data = mail.fetch(eid, '(RFC822)')
-        if status != 'OK':
-            continue
-
-        msg = email.message_from_bytes(msg_data[0][1], policy=policy.default)
-        sender = msg['From']
-        subject = msg['Subject']
+    # Emails from earlier runs already contributed their listings; rescan everything if those were lost
+    seen_uids = load_seen_uids(uidvalidity) if listings else set()
+
+    # SINCE only compares dates in the server's timezone, so allow a day of slack; the exact cutoff is applied per email below
+    since = (now - MAX_LISTING_AGE - timedelta(days=1)).strftime('%d-%b-%Y')
+    status, data = mail.uid('SEARCH', None, SEARCH_CRITERIA, 'SINCE', since)
+    uids = [int(uid) for uid in data[0].split()]
+    new_uids = [uid for uid in uids if uid not in seen_uids]
+    print(f"📥 Found {len(uids)} emails, {len(new_uids)} new to process")
+
+    messages, fetched_uids = fetch_messages(mail, new_uids)
+    # Newest first, as before, so the latest copy of a listing wins the name check
+    messages.sort(key=lambda m: m[0], reverse=True)
+    jobs = []
+    for _, header, body in messages:
+        headers = HEADER_PARSER.parsebytes(header)
+        sender = headers['From']
+        subject = headers['Subject']
         print(f"\n📧 Email from: {sender} | Subject: {subject}")
-        received_time = utils.parsedate_to_datetime(msg['Date']).astimezone(timezone.utc).isoformat()
-
-        body = ""
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == 'text/html':
-                    body = part.get_content()
-                    break
-        else:
-            body = msg.get_content()
+        received_dt = utils.parsedate_to_datetime(headers['Date']).astimezone(timezone.utc)
+        # Every listing in a stale email would fail the age check, so skip parsing its HTML at all
+        if now - received_dt > MAX_LISTING_AGE:
+            print("⚠️ Skipped (email too old)")
+            continue
+        jobs.append((body, received_dt.isoformat(), extracted_time, str(sender)))
 
-        new_listings = extract_listings_from_email(body, received_time)
+    for new_listings in extract_all_listings(jobs):
         for listing in new_listings:
-            if listing['name'] not in seen_names and validate_listing(listing):
+            if listing['name'] not in seen_names and validate_listing(listing, now):
                 listings.append(listing)
                 seen_names.add(listing['name'])
             else:
-                print(f"⚠️ Duplicate or invalid: {listing['name']}")
+                if DEBUG:
+                    print(f"⚠️ Duplicate or invalid: {listing['name']}")
+
+    if fetched_uids:
+        mail.uid('STORE', optimize_sequence(fetched_uids), '+FLAGS', '\\Seen')
+    mail.logout()
 
     listings = compute_score(listings)
-    save_listings(listings)
+    if not save_listings(listings):
+        # Leave seen_uids.json alone so the next run fetches these emails again
+        print("❌ Listings were not saved; emails from this run will be reprocessed")
+        return
+    # UIDs outside the SINCE window can never come back from the search, so stop tracking them
+    save_seen_uids(uidvalidity, (seen_uids & set(uids)) | set(fetched_uids))
     print(f"\n✅ Done. Total listings saved: {len(listings)}")
 
 
@@ -9,6 +9,58 @@ OUTPUT_DIR = 'docs'
 OUTPUT_FILE = 'index.html'
 NOW_UTC = datetime.now(timezone.utc)
 GENERATED_DATE_STR = NOW_UTC.strftime("%Y-%m-%d %H:%M:%S %Z")
+# Static stylesheet, kept out of the page f-string so it needs no brace escaping
+HTML_STYLE = """  <style>
+    body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; padding: 20px; background-color: #f4f7f9; color: #333; }
+    .container { max-width: 1200px; margin: 0 auto; }
+    h1 { text-align: center; color: #2c3e50; margin-bottom: 10px; }
+    .subtitle { text-align: center; color: #7f8c8d; margin-top: 0; margin-bottom: 30px; font-size: 0.9em; }
+    .summary { background-color: #eaf2f8; border-left: 5px solid #3498db; padding: 10px 15px; margin-bottom: 25px; font-size: 0.95em; border-radius: 4px; }
+    .summary p { margin: 5px 0; }
+    .summary strong { color: #2980b9; }
+
+    .card-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
+
+    .card {
+      background: white;
+      border-radius: 8px;
+      box-shadow: 0 2px 8px rgba(0,0,0,0.08);
+      padding: 15px 20px;
+      display: flex;
+      flex-direction: column;
+      transition: box-shadow 0.2s ease-in-out;
+    }
+    .card:hover { box-shadow: 0 5px 15px rgba(0,0,0,0.12); }
+
+    .card-header { display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 10px; }
+    .card-title a {
+        text-decoration: none; color: #34495e; font-weight: 600; font-size: 1.1em;
+        /* Prevent long titles from breaking layout */
+        overflow: hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;
+    }
+    .card-title a:hover { color: #3498db; }
+
+    .score-badge {
+        font-size: 0.9em; font-weight: bold; padding: 3px 8px; border-radius: 12px;
+        color: white; white-space: nowrap; /* Prevent wrapping */
+    }
+
+    .card-body { font-size: 0.9em; color: #555; margin-bottom: 15px; flex-grow: 1; } /* Allow body to grow */
+    .card-body strong { color: #333; }
+    .card-body .detail-item { margin-bottom: 5px; }
+    .card-body .detail-item .label { display: inline-block; width: 20px; text-align: center; margin-right: 5px; opacity: 0.7; } /* Icons */
+
+    .card-footer { font-size: 0.8em; color: #888; border-top: 1px solid #eee; padding-top: 10px; margin-top: auto; } /* Push footer down */
+    .card-footer span { display: inline-block; margin-right: 10px; }
+
+    /* Responsive adjustments */
+    @media (max-width: 600px) {
+        body { padding: 10px; }
+        h1 { font-size: 1.5em; }
+        .card-grid { grid-template-columns: 1fr; } /* Stack cards on small screens */
+    }
+  </style>
+"""
 
 # --- Helper Functions ---
 def format_currency(value):
@@ -104,57 +156,7 @@ html_head = f"""<!DOCTYPE html>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
   <title>🏠 House Listings Dashboard</title>
-  <style>
-    body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; padding: 20px; background-color: #f4f7f9; color: #333; }}
-    .container {{ max-width: 1200px; margin: 0 auto; }}
-    h1 {{ text-align: center; color: #2c3e50; margin-bottom: 10px; }}
-    .subtitle {{ text-align: center; color: #7f8c8d; margin-top: 0; margin-bottom: 30px; font-size: 0.9em; }}
-    .summary {{ background-color: #eaf2f8; border-left: 5px solid #3498db; padding: 10px 15px; margin-bottom: 25px; font-size: 0.95em; border-radius: 4px; }}
-    .summary p {{ margin: 5px 0; }}
-    .summary strong {{ color: #2980b9; }}
-
-    .card-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }}
-
-    .card {{
-      background: white;
-      border-radius: 8px;
-      box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-      padding: 15px 20px;
-      display: flex;
-      flex-direction: column;
-      transition: box-shadow 0.2s ease-in-out;
-    }}
-    .card:hover {{ box-shadow: 0 5px 15px rgba(0,0,0,0.12); }}
-
-    .card-header {{ display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 10px; }}
-    .card-title a {{
-        text-decoration: none; color: #34495e; font-weight: 600; font-size: 1.1em;
-        /* Prevent long titles from breaking layout */
-        overflow: hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;
-    }}
-    .card-title a:hover {{ color: #3498db; }}
-
-    .score-badge {{
-        font-size: 0.9em; font-weight: bold; padding: 3px 8px; border-radius: 12px;
-        color: white; white-space: nowrap; /* Prevent wrapping */
-    }}
-
-    .card-body {{ font-size: 0.9em; color: #555; margin-bottom: 15px; flex-grow: 1; }} /* Allow body to grow */
-    .card-body strong {{ color: #333; }}
-    .card-body .detail-item {{ margin-bottom: 5px; }}
-    .card-body .detail-item .label {{ display: inline-block; width: 20px; text-align: center; margin-right: 5px; opacity: 0.7; }} /* Icons */
-
-    .card-footer {{ font-size: 0.8em; color: #888; border-top: 1px solid #eee; padding-top: 10px; margin-top: auto; }} /* Push footer down */
-    .card-footer span {{ display: inline-block; margin-right: 10px; }}
-
-    /* Responsive adjustments */
-    @media (max-width: 600px) {{
-        body {{ padding: 10px; }}
-        h1 {{ font-size: 1.5em; }}
-        .card-grid {{ grid-template-columns: 1fr; }} /* Stack cards on small screens */
-    }}
-  </style>
-</head>
+{HTML_STYLE}</head>
 <body>
   <div class="container">
     <h1>🏠 House Listings Dashboard</h1>
@@ -169,9 +171,10 @@ html_head = f"""<!DOCTYPE html>
     <div class="card-grid">
 """
 
-html_cards = ""
+# Cards are collected and joined once; repeated += would recopy the page for every listing
+cards = []
 if not listings:
-    html_cards = "<p style='text-align: center; color: #777;'>No listings found or loaded.</p>"
+    cards.append("<p style='text-align: center; color: #777;'>No listings found or loaded.</p>")
 else:
     for idx, l in enumerate(listings):
         score = l.get('score', 0.0)
@@ -182,7 +185,7 @@ else:
         received_str = format_datetime_readable(l.get('received_time'))
         last_seen_str = format_datetime_readable(l.get('last_seen_utc_iso'))
 
-        html_cards += f"""
+        cards.append(f"""
       <div class="card">
         <div class="card-header">
           <div class="card-title"><a href="{l.get('link', '#')}" target="_blank" title="{l.get('name', 'No Title')}">{l.get('name', 'No Title')}</a></div>
@@ -201,7 +204,8 @@ else:
           <span><span title="Last Seen in Scrape">👀</span> {last_seen_str}</span>
         </div>
       </div>
-      """
+      """)
+html_cards = "".join(cards)
 
 html_foot = """
     </div> </div> </body>
@@ -215,7 +219,9 @@ output_file_path = output_path / OUTPUT_FILE
 
 try:
     with open(output_file_path, "w", encoding="utf-8") as f:
-        f.write(html_head + html_cards + html_foot)
+        f.write(html_head)
+        f.write(html_cards)
+        f.write(html_foot)
     print(f"✅ Generated {output_file_path}")
 except Exception as e:
     print(f"❌ Error writing HTML file to {output_file_path}: {e}")
@@ -0,0 +1,105 @@
+from email_scraper import (
+    find_html_section,
+    parse_bodystructure,
+    parse_fetch_response,
+    parse_structure_response,
+)
+
+# multipart/mixed holding a multipart/alternative (plain + html) and a PDF attachment
+MIXED_ALTERNATIVE = (
+    b'1 (UID 101 BODYSTRUCTURE ((('
+    b'"TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "QUOTED-PRINTABLE" 120 4 NIL NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "iso-8859-1") NIL NIL "BASE64" 2000 30 NIL NIL NIL NIL)'
+    b' "ALTERNATIVE" ("BOUNDARY" "b1") NIL NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "a.pdf") NIL NIL "BASE64" 5000 NIL ("ATTACHMENT" ("FILENAME" "a.pdf")) NIL NIL)'
+    b' "MIXED" ("BOUNDARY" "b0") NIL NIL NIL))'
+)
+SINGLE_HTML = b'2 (UID 102 BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET" "UTF-8") NIL NIL "QUOTED-PRINTABLE" 300 10 NIL NIL NIL NIL))'
+HTML_ATTACHMENT_ONLY = (
+    b'3 (UID 103 BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 10 1 NIL NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "BASE64" 50 2 NIL ("ATTACHMENT" ("FILENAME" "x.html")) NIL NIL)'
+    b' "MIXED" ("BOUNDARY" "b2") NIL NIL NIL))'
+)
+
+
+def sections(msg_data):
+    return {uid: find_html_section(structure) for uid, structure in parse_structure_response(msg_data)}
+
+
+def test_html_inside_alternative_inside_mixed():
+    assert sections([MIXED_ALTERNATIVE]) == {101: ('1.2', 'base64', 'iso-8859-1')}
+
+
+def test_single_part_html_is_section_1():
+    assert sections([SINGLE_HTML]) == {102: ('1', 'quoted-printable', 'UTF-8')}
+
+
+def test_html_attachment_is_not_the_body():
+    assert sections([HTML_ATTACHMENT_ONLY]) == {103: None}
+
+
+def test_batched_structures_keep_their_uids():
+    assert sections([MIXED_ALTERNATIVE, SINGLE_HTML]) == {
+        101: ('1.2', 'base64', 'iso-8859-1'),
+        102: ('1', 'quoted-printable', 'UTF-8'),
+    }
+
+
+def test_literal_split_across_tuple_boundary():
+    msg_data = [
+        (b'4 (UID 104 BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET" {5}', b'utf-8'),
+        b') NIL NIL "7BIT" 10 1 NIL NIL NIL NIL))',
+        SINGLE_HTML,
+    ]
+    assert sections(msg_data) == {104: ('1', '7bit', 'utf-8'), 102: ('1', 'quoted-printable', 'UTF-8')}
+
+
+def test_missing_charset_defaults_to_utf8():
+    msg_data = [b'5 (UID 105 BODYSTRUCTURE ("TEXT" "HTML" NIL NIL NIL "7BIT" 10 1 NIL NIL NIL NIL))']
+    assert sections(msg_data) == {105: ('1', '7bit', 'utf-8')}
+
+
+def test_nil_and_malformed_structures_fall_back():
+    msg_data = [
+        b'6 (UID 106 BODYSTRUCTURE NIL)',
+        b'7 (UID 107 BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET"',
+        b'8 (UID 108 BODYSTRUCTURE ("APPLICATION" "OCTET-STREAM" NIL NIL NIL "BASE64" 5 NIL NIL NIL NIL))',
+    ]
+    assert sections(msg_data) == {106: None, 107: None, 108: None}
+    assert parse_bodystructure(b'(unterminated') is None
+    assert find_html_section(None) is None
+
+
+def test_fetch_response_header_then_section():
+    msg_data = [
+        (b'1 (UID 101 BODY[HEADER.FIELDS (DATE FROM SUBJECT)] {4}', b'Hdr1'),
+        (b' BODY[1.2] {5}', b'body1'),
+        b')',
+        (b'2 (UID 102 BODY[HEADER.FIELDS (DATE FROM SUBJECT)] {4}', b'Hdr2'),
+        (b' BODY[1] {5}', b'body2'),
+        b')',
+    ]
+    assert parse_fetch_response(msg_data) == [(101, 1, b'Hdr1', b'body1'), (102, 2, b'Hdr2', b'body2')]
+
+
+def test_fetch_response_section_before_header():
+    msg_data = [
+        (b'1 (UID 101 BODY[1.2] {5}', b'body1'),
+        (b' BODY[HEADER.FIELDS (DATE FROM SUBJECT)] {4}', b'Hdr1'),
+        b')',
+    ]
+    assert parse_fetch_response(msg_data) == [(101, 1, b'Hdr1', b'body1')]
+
+
+def test_fetch_response_uid_after_literals():
+    msg_data = [
+        (b'3 (BODY[HEADER.FIELDS (DATE FROM SUBJECT)] {4}', b'Hdr3'),
+        (b' BODY[TEXT] {5}', b'body3'),
+        b' UID 103)',
+    ]
+    assert parse_fetch_response(msg_data) == [(103, 3, b'Hdr3', b'body3')]
+
+
+def test_fetch_response_without_uid():
+    msg_data = [(b'4 (BODY[1] {5}', b'body4'), b')']
+    assert parse_fetch_response(msg_data) == [(None, 4, b'', b'body4')]